@@ -1,13 +1,15 @@
-import pandas as pd
 import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
 from faker import Faker
-import random
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+import os
+import time
 
-# Initialize Faker for Brazilian Portuguese data and set seeds for reproducibility
-fake = Faker('pt_BR')
-Faker.seed(42)
-np.random.seed(42)
-random.seed(42)
+# Seed for reproducibility: Faker pools use it directly and every chunk derives
+# its own RNG from it, so the output does not depend on how chunks are scheduled
+semente = 42
 
 # Brazilian states and some real cities
 estados_cidades = {
@@ -31,60 +33,128 @@ produtos_por_categoria = {
 }
 
 # Number of rows to generate
-# NOTE: 3000_000 equals 300.000 rows (underscore is just a visual separator).
-# Generating this many rows with Faker can be very slow and memory-intensive.
+# NOTE: 3000_000 equals 3.000.000 rows (underscore is just a visual separator).
 num_linhas = 3000_000
 
-# Generate data
-data = []
-for i in range(1, num_linhas + 1):
+# Rows are generated in chunks of this size by a pool of worker processes and
+# written in order, so only a few chunks are held in memory regardless of num_linhas
+tamanho_lote = 250_000
+num_workers = os.cpu_count() or 1
+
+# Faker calls (name, address) are relatively expensive operations, so a pool of
+# values is generated once (in the main process) and rows sample from it
+tamanho_pool = 50_000
+
+# Lookup tables: categorical columns are drawn as integer codes into these
+# arrays (codes index the rows; the second draw indexes the city/product inside
+# the chosen state/category). The flattened labels are the dictionaries of the
+# dictionary-encoded columns, so the labels are never repeated per row
+estados = np.array(list(estados_cidades))
+cidades = np.array([estados_cidades[e] for e in estados])
+categorias = np.array(categorias_produtos)
+produtos = np.array([produtos_por_categoria[c] for c in categorias])
+dic_estados = pa.array(estados)
+dic_cidades = pa.array(cidades.ravel())
+dic_categorias = pa.array(categorias)
+dic_produtos = pa.array(produtos.ravel())
+
+# Low-cardinality columns are dictionary-encoded (int8 codes + labels)
+categorico = pa.dictionary(pa.int8(), pa.string())
+schema = pa.schema([
+    ('id_venda', pa.int64()),
+    ('data_hora', pa.timestamp('s')),
+    ('cliente', pa.string()),
+    ('vendedor', pa.string()),
+    ('produto', categorico),
+    ('categoria', categorico),
+    ('quantidade', pa.int64()),
+    ('preco_unitario', pa.float64()),
+    ('desconto', pa.float64()),
+    ('estado', categorico),
+    ('cidade', categorico),
+    ('endereco', pa.string()),
+])
+
+
+def gerar_lote(primeiro_id: int, n: int) -> pa.RecordBatch:
+    """Generate n rows with ids starting at primeiro_id as an Arrow record batch."""
+    rng = np.random.default_rng([semente, primeiro_id])
+
+    # Every column is built as a whole NumPy array instead of row by row
     # Randomly pick state and city
-    estado = random.choice(list(estados_cidades.keys()))
-    cidade = random.choice(estados_cidades[estado])
+    est_idx = rng.integers(0, len(estados), n, dtype=np.int8)
+    cid_idx = est_idx * cidades.shape[1] + rng.integers(0, cidades.shape[1], n, dtype=np.int8)
 
     # Randomly pick category and product within that category
-    categoria = random.choice(categorias_produtos)
-    produto = random.choice(produtos_por_categoria[categoria])
+    cat_idx = rng.integers(0, len(categorias), n, dtype=np.int8)
+    prod_idx = cat_idx * produtos.shape[1] + rng.integers(0, produtos.shape[1], n, dtype=np.int8)
 
     # Quantity between 1 and 10
-    quantidade = random.randint(1, 10)
+    quantidade = rng.integers(1, 11, n, dtype=np.int64)
 
     # 10% of transactions are returns (negative quantity)
-    if random.random() < 0.1:
-        quantidade *= -1
+    quantidade[rng.random(n) < 0.1] *= -1
 
     # Unit price between 10 and 2000, rounded to 2 decimals
-    preco_unitario = round(random.uniform(10, 2000), 2)
+    preco_unitario = np.round(rng.uniform(10, 2000, n), 2)
 
     # Discount between 0% and 30% of unit price, rounded to 2 decimals
-    desconto = round(random.uniform(0, 0.3) * preco_unitario, 2)
-
-    # Append a new record
-    # NOTE: Faker calls (name, address, datetime) are relatively expensive operations.
-    # Doing this in a tight loop for millions of rows will be slow.
-    data.append([
-        i,
-        fake.date_time_between(start_date='-1y', end_date='now').strftime('%Y-%m-%d %H:%M:%S'),
-        fake.name(),      # Customer
-        fake.name(),      # Seller
-        produto,
-        categoria,
-        quantidade,
-        preco_unitario,
-        desconto,
-        estado,
-        cidade,
-        fake.street_address()
-    ])
-
-# Create DataFrame from the generated list of rows
-# NOTE: Holding millions of rows in memory as Python objects will consume a lot of RAM.
-df = pd.DataFrame(data, columns=[
-    'id_venda', 'data_hora', 'cliente', 'vendedor', 'produto', 'categoria',
-    'quantidade', 'preco_unitario', 'desconto', 'estado', 'cidade', 'endereco'
-])
+    desconto = np.round(rng.uniform(0, 0.3, n) * preco_unitario, 2)
+
+    # Sale timestamp as epoch seconds; Parquet stores it as a real timestamp
+    data_hora = rng.integers(inicio, fim, n, dtype=np.int64)
+
+    return pa.RecordBatch.from_pydict({
+        'id_venda': np.arange(primeiro_id, primeiro_id + n, dtype=np.int64),
+        'data_hora': pa.array(data_hora, type=pa.timestamp('s')),
+        # Customer, seller and address are sampled from pre-generated Faker pools
+        'cliente': nomes.take(rng.integers(0, tamanho_pool, n)),
+        'vendedor': vendedores.take(rng.integers(0, tamanho_pool, n)),
+        'produto': pa.DictionaryArray.from_arrays(prod_idx, dic_produtos),
+        'categoria': pa.DictionaryArray.from_arrays(cat_idx, dic_categorias),
+        'quantidade': quantidade,
+        'preco_unitario': preco_unitario,
+        'desconto': desconto,
+        'estado': pa.DictionaryArray.from_arrays(est_idx, dic_estados),
+        'cidade': pa.DictionaryArray.from_arrays(cid_idx, dic_cidades),
+        'endereco': enderecos.take(rng.integers(0, tamanho_pool, n)),
+    }, schema=schema)
+
+
+def definir_contexto(*contexto) -> None:
+    """Worker initializer: receive the Faker pools and time range from the main process."""
+    global nomes, vendedores, enderecos, inicio, fim
+    nomes, vendedores, enderecos, inicio, fim = contexto
+
+
+if __name__ == '__main__':
+    # Initialize Faker for Brazilian Portuguese data
+    fake = Faker('pt_BR')
+    Faker.seed(semente)
+    nomes = pa.array([fake.name() for _ in range(tamanho_pool)])
+    vendedores = pa.array([fake.name() for _ in range(tamanho_pool)])
+    enderecos = pa.array([fake.street_address() for _ in range(tamanho_pool)])
+
+    # Sale timestamps fall within the last year
+    fim = int(time.time())
+    inicio = fim - 365 * 86400
+
+    # Stream chunks to Parquet (same format the API stores uploads in), compressed with zstd.
+    # Workers generate chunks in parallel while this process writes finished ones in id
+    # order; each chunk becomes its own row group and is discarded once written
+    with ProcessPoolExecutor(
+        max_workers=num_workers,
+        initializer=definir_contexto,
+        initargs=(nomes, vendedores, enderecos, inicio, fim),
+    ) as executor, pq.ParquetWriter('ecommerce_fake.parquet', schema, compression='zstd') as writer:
+        pendentes = deque()
+        for inicio_lote in range(0, num_linhas, tamanho_lote):
+            n = min(tamanho_lote, num_linhas - inicio_lote)
+            pendentes.append(executor.submit(gerar_lote, inicio_lote + 1, n))
+            # Keep at most two chunks per worker in flight to bound memory
+            if len(pendentes) >= 2 * num_workers:
+                writer.write_batch(pendentes.popleft().result())
+        while pendentes:
+            writer.write_batch(pendentes.popleft().result())
 
-# Save to CSV using ';' as separator (common in pt-BR locales)
-# TIP: Consider specifying encoding='utf-8-sig' if opening in Excel on Windows.
-df.to_csv('ecommerce_fake.csv', sep=';', index=False)
-print("CSV successfully generated: ecommerce_fake.csv")
\ No newline at end of file
+    print("Parquet successfully generated: ecommerce_fake.parquet")
@@ -1,17 +1,36 @@
 from fastapi import FastAPI, UploadFile, File, HTTPException, Query, Body
+from fastapi.responses import JSONResponse, StreamingResponse
 from pydantic import BaseModel
 from dotenv import load_dotenv
-from openai import OpenAI
+from openai import AsyncOpenAI
 import polars as pl
 import duckdb
+import pyarrow as pa
+import sqlglot
+from sqlglot import exp
 from pathlib import Path
+from cachetools import TTLCache
+import aiofiles
+import asyncio
+import orjson
+import functools
+import hashlib
 import os
+import psutil
 import re
+import tempfile
+import threading
 import uvicorn
 import logging
+from typing import Literal, Union
+from datetime import timedelta
+from decimal import Decimal
 
 load_dotenv()
 
+# Polars' default streaming chunk size is far too small for large CSV uploads
+pl.Config.set_streaming_chunk_size(100_000)
+
 # Logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("dataapp")
@@ -22,9 +41,94 @@ OPENAI_MODEL = os.getenv("OPENAI_MODEL", "gpt-4o-mini")
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 if not OPENAI_API_KEY:
     raise RuntimeError("Set OPENAI_API_KEY in .env")
+# Max rows returned by /query and /ask; larger results are cut and flagged as truncated
+MAX_ROWS = int(os.getenv("MAX_ROWS", "10000"))
+# LIMIT added to LLM-generated non-aggregate SELECTs that don't set one
+LLM_ROW_LIMIT = int(os.getenv("LLM_ROW_LIMIT", "1000"))
+# Rows of the /ask result shown to the LLM and returned unless ?full=true
+SAMPLE_ROWS = 5
+# Shape of "result": a list of row dicts, or {"columns": [...], "data": [column arrays]}
+Orient = Literal["records", "columns"]
+ORIENT_DESCRIPTION = "'records' (list of row objects) or 'columns' ({columns, data} with one array per column)"
+# Uploads are streamed to disk in chunks of this many bytes
+UPLOAD_CHUNK_SIZE = 1 << 20
+# Each uvicorn worker is a separate process with its own DuckDB connection
+WORKERS = int(os.getenv("WORKERS", os.cpu_count() or 1))
+# DuckDB resources per worker. By default the CPUs and half of the RAM are split
+# between workers: a memory_limit close to (or above) physical RAM makes DuckDB fight
+# the OS and the other workers instead of spilling to disk, which is slower than a
+# lower limit, and cpu_count threads in every worker oversubscribes the CPUs
+DUCKDB_THREADS = int(os.getenv("DUCKDB_THREADS", max(1, (os.cpu_count() or 1) // WORKERS)))
+DUCKDB_MEMORY_LIMIT = os.getenv(
+    "DUCKDB_MEMORY_LIMIT", f"{(psutil.virtual_memory().total // 2 // WORKERS) >> 20}MB"
+)
+# Where DuckDB spills to disk; point it at a fast local disk (SSD)
+DUCKDB_TEMP_DIR = os.getenv("DUCKDB_TEMP_DIR", ".tmp")
+
+def sql_str(value: str) -> str:
+    # Escape a value for a SQL string literal (DuckDB uses '')
+    return value.replace("'", "''")
+
+def _json_default(value):
+    # Types orjson can't serialize, converted the same way FastAPI's jsonable_encoder does
+    if isinstance(value, Decimal):
+        # orjson only takes integers in [-2**63, 2**64); HUGEINT/DECIMAL(38,0) may exceed it
+        if value.as_tuple().exponent >= 0 and -(1 << 63) <= value < (1 << 64):
+            return int(value)
+        return float(value)
+    if isinstance(value, timedelta):
+        return value.total_seconds()
+    if isinstance(value, bytes):
+        return value.decode()
+    if isinstance(value, tuple):  # namedtuples, e.g. Arrow's MonthDayNano for INTERVAL
+        return list(value)
+    raise TypeError
+
+def orjson_dumps(content, option: int = 0) -> bytes:
+    return orjson.dumps(content, default=_json_default, option=option | orjson.OPT_NON_STR_KEYS)
+
+class ORJSONResponse(JSONResponse):
+    # FastAPI's own ORJSONResponse is deprecated. Endpoints returning large results
+    # return this directly, which also skips FastAPI's per-value jsonable_encoder pass
+    def render(self, content) -> bytes:
+        return orjson_dumps(content)
+
+client = AsyncOpenAI(api_key=OPENAI_API_KEY)
+app = FastAPI(title="DataApp PoC", default_response_class=ORJSONResponse)
+
+# Single in-process DuckDB database shared by all requests; each request runs on
+# its own cursor. The 'data' VIEW is created once, on first use (DuckDB binds a view
+# at creation, so DATA_FILE must exist). read_parquet is re-bound on every query,
+# so the VIEW keeps working when an upload replaces DATA_FILE
+_CON = duckdb.connect(":memory:")
+_CON.execute(f"PRAGMA threads={DUCKDB_THREADS}")
+_CON.execute(f"PRAGMA memory_limit='{DUCKDB_MEMORY_LIMIT}'")
+# Keep Parquet metadata cached between queries over the same file
+_CON.execute("PRAGMA parquet_metadata_cache=true")
+# Row order is only guaranteed by an explicit ORDER BY; lets scans stay parallel
+_CON.execute("PRAGMA preserve_insertion_order=false")
+# Spill location for queries larger than memory_limit; one directory per worker,
+# since DuckDB manages (and cleans up) the whole directory. DuckDB only creates the last level
+os.makedirs(DUCKDB_TEMP_DIR, exist_ok=True)
+_CON.execute(f"PRAGMA temp_directory='{sql_str(os.path.join(DUCKDB_TEMP_DIR, str(os.getpid())))}'")
+# Settings are final for the worker's lifetime: no query can undo the tuning above
+_CON.execute("SET lock_configuration=true")
+_CON_LOCK = threading.Lock()
+_VIEW_CREATED = False
 
-client = OpenAI(api_key=OPENAI_API_KEY)
-app = FastAPI(title="DataApp PoC")
+# LLM-generated SQL keyed by (schema hash, normalized question). Only touched from
+# the event loop thread and never across an await, so it needs no lock
+_SQL_CACHE: TTLCache = TTLCache(maxsize=10_000, ttl=3600)
+
+# Prompts are constant; only the schema and the question vary per /ask
+SQL_SYSTEM_PROMPT = (
+    "Você é um assistente SQL DuckDB."
+    "Sempre que usar funções de data em colunas que podem ser string ou timestamp,"
+    "faça cast explícito para TIMESTAMP."
+    "Responda SOMENTE com uma query SQL válida (sem explicações). "
+    "Apenas use a tabela/VIEW 'data'."
+)
+FRIENDLY_SYSTEM_PROMPT = "Explique o resultado de forma breve e clara em português do Brasil (pt-BR)."
 
 # ----------------------
 # Utilities
@@ -33,27 +137,114 @@ def ensure_data_exists() -> None:
     if not DATA_FILE.exists():
         raise HTTPException(status_code=400, detail="No data loaded yet. Please upload a file first.")
 
-def get_schema_str() -> str:
+@functools.lru_cache(maxsize=4)
+def _schema_str_cached(path: str, mtime_ns: int) -> str:
     # Use scan to avoid loading data; read metadata only
-    schema = pl.scan_parquet(DATA_FILE).schema
+    schema = pl.scan_parquet(path).collect_schema()
     return "\n".join(f"{name}: {dtype}" for name, dtype in schema.items())
 
-def open_duck() -> duckdb.DuckDBPyConnection:
-    con = duckdb.connect()
-    # Interpolate as a string literal and escape single quotes (DuckDB uses '')
-    path = str(DATA_FILE).replace("'", "''")
-    con.execute(f"CREATE OR REPLACE VIEW data AS SELECT * FROM read_parquet('{path}')")
-    return con
+def get_schema_str() -> str:
+    # Keyed by mtime, so repeated /ask calls skip the footer read until DATA_FILE changes
+    return _schema_str_cached(str(DATA_FILE), DATA_FILE.stat().st_mtime_ns)
+
+def get_duck() -> duckdb.DuckDBPyConnection:
+    # Return the shared connection, creating the VIEW on first use.
+    # Callers must use get_duck().cursor() so concurrent requests don't share state
+    global _VIEW_CREATED
+    if not _VIEW_CREATED:
+        with _CON_LOCK:
+            if not _VIEW_CREATED:
+                # DuckDB can't take a prepared parameter in CREATE VIEW: interpolate
+                # as a string literal and escape single quotes (DuckDB uses '')
+                _CON.execute(f"CREATE OR REPLACE VIEW data AS SELECT * FROM read_parquet('{sql_str(str(DATA_FILE))}')")
+                _VIEW_CREATED = True
+    return _CON
+
+def fetch_arrow(rel, limit: int) -> tuple[pa.Table, bool]:
+    # Stream Arrow record batches and stop as soon as more than `limit` rows were
+    # read, so a large result is never fully materialized. Avoid pandas/Polars here
+    reader = rel.to_arrow_reader(min(limit + 1, 10_000))
+    batches, n = [], 0
+    for batch in reader:
+        batches.append(batch)
+        n += batch.num_rows
+        if n > limit:
+            break
+    return pa.Table.from_batches(batches, schema=reader.schema).slice(0, limit), n > limit
+
+def to_payload(table: pa.Table, orient: Orient) -> Union[list[dict], dict]:
+    # "records": one dict per row (keys repeated per row).
+    # "columns": {"columns": [names], "data": [[values of column 0], [values of column 1], ...]},
+    # built straight from the Arrow columns, which is smaller and faster for long/wide results
+    if orient == "columns":
+        return {"columns": table.column_names, "data": [col.to_pylist() for col in table.columns]}
+    return table.to_pylist()
+
+_READ_ONLY_STATEMENTS = (duckdb.StatementType.SELECT, duckdb.StatementType.EXPLAIN)
 
-def to_records_from_relation(rel) -> list[dict]:
-    # Convert to Polars then to a list of dicts
-    # Avoid pandas on this path
-    return rel.pl().to_dicts()
+def check_read_only(sql: str) -> None:
+    # Every request shares the worker's connection: a DROP VIEW data or SET threads=...
+    # would outlive the request, so only a single SELECT/EXPLAIN may run.
+    # DESCRIBE, SUMMARIZE and SHOW are SELECT statements to DuckDB
+    statements = duckdb.extract_statements(sql)
+    if len(statements) != 1 or statements[0].type not in _READ_ONLY_STATEMENTS:
+        raise ValueError("Only a single read-only query (SELECT, DESCRIBE, SUMMARIZE, EXPLAIN) is allowed")
+
+def run_query(sql: str, limit: int = MAX_ROWS, orient: Orient = "records") -> tuple[Union[list[dict], dict], int, bool]:
+    # Blocking; async endpoints call it via asyncio.to_thread to keep the event loop free.
+    # Returns the payload, its row count and whether it was truncated
+    check_read_only(sql)
+    with get_duck().cursor() as con:
+        table, truncated = fetch_arrow(con.execute(sql), limit)
+    return to_payload(table, orient), table.num_rows, truncated
+
+def iter_ndjson(con: duckdb.DuckDBPyConnection, reader):
+    # Blocking generator (StreamingResponse iterates it in a thread); closes the cursor when done
+    try:
+        for batch in reader:
+            yield b"".join(orjson_dumps(row, orjson.OPT_APPEND_NEWLINE) for row in batch.to_pylist())
+    finally:
+        con.close()
+
+def sample_query(sql: str) -> tuple[pa.Table, int]:
+    # Blocking; first SAMPLE_ROWS rows and total row count of `sql`, computed by
+    # DuckDB on the same cursor so the full result is never sent to Python.
+    # Newlines keep a trailing `--` comment in `sql` from swallowing the ')'
+    with get_duck().cursor() as con:
+        sample, _ = fetch_arrow(con.execute(f"SELECT * FROM (\n{sql}\n) LIMIT {SAMPLE_ROWS}"), SAMPLE_ROWS)
+        row_count = con.execute(f"SELECT COUNT(*) FROM (\n{sql}\n)").fetchone()[0]
+    return sample, row_count
+
+def convert_upload(raw: Path, ext: str) -> tuple[int, int]:
+    # Blocking; convert the uploaded file to DATA_FILE with Polars' streaming engine.
+    # The Parquet is written next to DATA_FILE and swapped in atomically, so
+    # concurrent queries never read a half-written file
+    fd, out_name = tempfile.mkstemp(suffix=".parquet", dir=DATA_FILE.parent)
+    os.close(fd)
+    out = Path(out_name)
+    try:
+        if ext == ".csv":
+            # Try ';' first, fallback to ','
+            try:
+                pl.scan_csv(raw, separator=";").sink_parquet(out, compression="zstd", row_group_size=256_000)
+            except Exception:
+                pl.scan_csv(raw).sink_parquet(out, compression="zstd", row_group_size=256_000)  # default separator (,)
+        else:
+            pl.scan_parquet(raw).sink_parquet(out, compression="zstd", row_group_size=256_000)
+        os.replace(out, DATA_FILE)
+    finally:
+        out.unlink(missing_ok=True)
+    # Row count and schema come from the Parquet footer, no data is read
+    lf = pl.scan_parquet(DATA_FILE)
+    return lf.select(pl.len()).collect().item(), len(lf.collect_schema())
+
+_FENCE_RE = re.compile(r"```(?:sql)?", re.IGNORECASE)
+_SQL_RE = re.compile(r"(SELECT|WITH)\s.*", re.IGNORECASE | re.DOTALL)
 
 def parse_sql_from_llm(text: str) -> str:
     # Remove code fences and extract the query starting at SELECT/WITH
-    sql_raw = re.sub(r"```(?:sql)?", "", text, flags=re.IGNORECASE).strip()
-    m = re.search(r"(SELECT|WITH)\s.*", sql_raw, re.IGNORECASE | re.DOTALL)
+    sql_raw = _FENCE_RE.sub("", text).strip()
+    m = _SQL_RE.search(sql_raw)
     if not m:
         raise HTTPException(status_code=400, detail=f"Could not extract SQL from LLM response. Raw: {sql_raw}")
     sql = m.group(0).strip()
@@ -61,6 +252,31 @@ def parse_sql_from_llm(text: str) -> str:
     sql = sql[:-1].strip() if sql.endswith(";") else sql
     return sql
 
+def guard_sql(sql: str) -> str:
+    # Gate LLM-generated SQL before running it: a single read-only query, and a LIMIT
+    # on non-aggregate SELECTs so a hallucinated `SELECT *` can't exhaust memory
+    try:
+        statements = [s for s in sqlglot.parse(sql, read="duckdb") if s is not None]
+    except sqlglot.errors.SqlglotError as e:
+        raise HTTPException(status_code=400, detail=f"Could not parse generated SQL: {e}\nQuery: {sql}")
+    if len(statements) != 1 or not isinstance(statements[0], exp.Query):
+        raise HTTPException(status_code=400, detail=f"Generated SQL must be a single SELECT query.\nQuery: {sql}")
+    parsed = statements[0]
+    if parsed.args.get("limit") is not None:
+        return sql
+    if isinstance(parsed, exp.Select):
+        # GROUP BY or an aggregate outside a window function means the rows are already
+        # reduced; aggregates inside scalar subqueries belong to their own SELECT
+        aggregated = parsed.args.get("group") is not None or any(
+            agg.find_ancestor(exp.Window) is None and agg.find_ancestor(exp.Select) is parsed
+            for e in parsed.expressions for agg in e.find_all(exp.AggFunc)
+        )
+        if aggregated:
+            return sql
+    # sqlglot only classifies the query: regenerating it would rename functions (and so
+    # output columns), so the cap wraps the original text the same way sample_query does
+    return f"SELECT * FROM (\n{sql}\n) LIMIT {LLM_ROW_LIMIT}"
+
 # ----------------------
 # Endpoints
 # ----------------------
@@ -68,76 +284,107 @@ def parse_sql_from_llm(text: str) -> str:
 async def upload_file(file: UploadFile = File(...)):
     ext = Path(file.filename).suffix.lower()
     logger.info("Uploading file: name=%s ext=%s", file.filename, ext)
+    if ext not in (".csv", ".parquet"):
+        raise HTTPException(status_code=415, detail="Unsupported format. Use CSV or Parquet.")
+
+    DATA_FILE.parent.mkdir(parents=True, exist_ok=True)
+    fd, raw_name = tempfile.mkstemp(suffix=ext, dir=DATA_FILE.parent)
+    os.close(fd)
+    raw = Path(raw_name)
     try:
-        if ext == ".csv":
-            # Try ';' first, fallback to ','
-            try:
-                df = pl.read_csv(file.file, separator=";")
-            except Exception:
-                file.file.seek(0)
-                df = pl.read_csv(file.file)  # default separator (,)
-        elif ext == ".parquet":
-            df = pl.read_parquet(file.file)
-        else:
-            raise HTTPException(status_code=415, detail="Unsupported format. Use CSV or Parquet.")
+        # Stream the upload to disk so memory stays bounded by the chunk size
+        async with aiofiles.open(raw, "wb") as f:
+            while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+                await f.write(chunk)
+        rows, cols = await asyncio.to_thread(convert_upload, raw, ext)
     except Exception as e:
         logger.exception("Failed to read uploaded file")
         raise HTTPException(status_code=400, detail=f"Failed to read file: {e}")
+    finally:
+        raw.unlink(missing_ok=True)
 
-    DATA_FILE.parent.mkdir(parents=True, exist_ok=True)
-    df.write_parquet(DATA_FILE)
-    logger.info("File saved to %s (rows=%d, cols=%d)", DATA_FILE, df.height, df.width)
-    return {"message": f"File {file.filename} uploaded successfully.", "rows": df.height, "cols": df.width}
+    logger.info("File saved to %s (rows=%d, cols=%d)", DATA_FILE, rows, cols)
+    return {"message": f"File {file.filename} uploaded successfully.", "rows": rows, "cols": cols}
 
 @app.get("/query")
-async def query_data(q: str = Query(..., description="SQL against the 'data' VIEW")):
+async def query_data(
+    q: str = Query(..., description="SQL against the 'data' VIEW"),
+    limit: int = Query(MAX_ROWS, ge=1, le=MAX_ROWS, description="Max rows to return"),
+    orient: Orient = Query("records", description=ORIENT_DESCRIPTION),
+):
     ensure_data_exists()
     logger.info("Executing /query: %s", q)
     try:
-        with open_duck() as con:
-            rel = con.execute(q)
-            result = to_records_from_relation(rel)
-        logger.info("/query executed successfully: rows=%d", len(result))
-        return {"query": q, "result": result}
+        result, rows, truncated = await asyncio.to_thread(run_query, q, limit, orient)
+        logger.info("/query executed successfully: rows=%d truncated=%s", rows, truncated)
+        return ORJSONResponse({"query": q, "result": result, "truncated": truncated})
     except Exception as e:
         logger.exception("Error executing /query")
         raise HTTPException(status_code=400, detail=f"Error executing query: {e}")
 
+@app.get("/query/stream")
+async def query_data_stream(q: str = Query(..., description="SQL against the 'data' VIEW")):
+    # Full result as NDJSON (one row per line), without MAX_ROWS: rows are sent
+    # batch by batch, so memory stays bounded by the batch size
+    ensure_data_exists()
+    logger.info("Executing /query/stream: %s", q)
+    try:
+        check_read_only(q)
+    except Exception as e:
+        logger.exception("Error executing /query/stream")
+        raise HTTPException(status_code=400, detail=f"Error executing query: {e}")
+    con = get_duck().cursor()
+    try:
+        # Execute before responding so SQL errors still become a 400
+        reader = await asyncio.to_thread(lambda: con.execute(q).to_arrow_reader(10_000))
+    except Exception as e:
+        con.close()
+        logger.exception("Error executing /query/stream")
+        raise HTTPException(status_code=400, detail=f"Error executing query: {e}")
+    return StreamingResponse(iter_ndjson(con, reader), media_type="application/x-ndjson")
+
 class AskBody(BaseModel):
     question: str
 
-async def _execute_ask(question: str):
+async def _execute_ask(question: str, full: bool = False, orient: Orient = "records"):
     ensure_data_exists()
     logger.info("Processing /ask question: %s", question)
 
     # Context: a single table/VIEW 'data'
-    schema_info = get_schema_str()
-    system = (
-        "Você é um assistente SQL DuckDB."
-        "Sempre que usar funções de data em colunas que podem ser string ou timestamp,"
-        "faça cast explícito para TIMESTAMP."
-        "Responda SOMENTE com uma query SQL válida (sem explicações). "
-        "Apenas use a tabela/VIEW 'data'."
-    )
-    user_sql = f"Schema of 'data':\n{schema_info}\n\nQuestion: {question}"
+    schema_info = await asyncio.to_thread(get_schema_str)
+    # Same schema + same question gives the same SQL: skip the LLM round-trip on a hit.
+    # Only the SQL is cached; the friendly answer depends on the current data
+    cache_key = (hashlib.blake2b(schema_info.encode(), digest_size=16).digest(), question.strip().lower())
+    cached = _SQL_CACHE.get(cache_key)
+    if cached is not None:
+        base_sql, sql = cached
+        logger.info("Reusing cached SQL: %s", sql)
+    else:
+        user_sql = f"Schema of 'data':\n{schema_info}\n\nQuestion: {question}"
+        try:
+            response_sql = await client.chat.completions.create(
+                model=OPENAI_MODEL,
+                messages=[{"role": "system", "content": SQL_SYSTEM_PROMPT}, {"role": "user", "content": user_sql}],
+                temperature=0
+            )
+            base_sql = parse_sql_from_llm(response_sql.choices[0].message.content or "")
+            logger.info("LLM-generated SQL: %s", base_sql)
+        except Exception as e:
+            logger.exception("Failed to generate SQL via LLM")
+            raise HTTPException(status_code=400, detail=f"Failed to generate SQL via LLM: {e}")
+        sql = guard_sql(base_sql)
+        _SQL_CACHE[cache_key] = (base_sql, sql)
 
     try:
-        response_sql = client.chat.completions.create(
-            model=OPENAI_MODEL,
-            messages=[{"role": "system", "content": system}, {"role": "user", "content": user_sql}],
-            temperature=0
-        )
-        sql = parse_sql_from_llm(response_sql.choices[0].message.content or "")
-        logger.info("LLM-generated SQL: %s", sql)
-    except Exception as e:
-        logger.exception("Failed to generate SQL via LLM")
-        raise HTTPException(status_code=400, detail=f"Failed to generate SQL via LLM: {e}")
-
-    try:
-        with open_duck() as con:
-            rel = con.execute(sql)
-            rows = to_records_from_relation(rel)
-        logger.info("Generated SQL executed successfully: rows=%d", len(rows))
+        # Sample and count the SQL as generated, so row_count isn't capped by the
+        # LIMIT guard_sql may have injected; the full result runs the guarded query
+        sample, row_count = await asyncio.to_thread(sample_query, base_sql)
+        if full:
+            rows, num_rows, truncated = await asyncio.to_thread(run_query, sql, MAX_ROWS, orient)
+            truncated = truncated or num_rows < row_count
+        else:
+            rows, truncated = to_payload(sample, orient), row_count > sample.num_rows
+        logger.info("Generated SQL executed successfully: rows=%d truncated=%s", row_count, truncated)
     except Exception as e:
         logger.exception("Error executing LLM-generated SQL")
         raise HTTPException(status_code=400, detail=f"Error executing generated SQL: {e}\nQuery: {sql}")
@@ -145,14 +392,14 @@ async def _execute_ask(question: str):
     # Generate a friendly/natural-language answer
     user_friendly = (
         f"User question: {question}\n"
-        f"Returned rows: {len(rows)}\n"
-        f"Sample rows: {rows[:5]}"
+        f"Returned rows: {row_count}\n"
+        f"Sample rows: {sample.to_pylist()}"
     )
     try:
-        response_friendly = client.chat.completions.create(
+        response_friendly = await client.chat.completions.create(
             model=OPENAI_MODEL,
             messages=[
-                {"role": "system", "content": "Explique o resultado de forma breve e clara em português do Brasil (pt-BR)."},
+                {"role": "system", "content": FRIENDLY_SYSTEM_PROMPT},
                 {"role": "user", "content": user_friendly},
             ],
             temperature=0
@@ -163,11 +410,23 @@ async def _execute_ask(question: str):
         logger.exception("Failed to generate friendly answer via LLM")
         raise HTTPException(status_code=400, detail=f"Failed to generate friendly answer via LLM: {e}")
 
-    return {"question": question, "query": sql, "result": rows, "friendly_answer": friendly_answer}
+    return ORJSONResponse({
+        "question": question, "query": sql, "result": rows, "row_count": row_count,
+        "truncated": truncated, "friendly_answer": friendly_answer,
+    })
 
 @app.post("/ask")
-async def ask_question_post(body: AskBody = Body(...)):
-    return await _execute_ask(body.question)
+async def ask_question_post(
+    body: AskBody = Body(...),
+    full: bool = Query(False, description=f"Return the full result (up to MAX_ROWS) instead of a {SAMPLE_ROWS}-row sample"),
+    orient: Orient = Query("records", description=ORIENT_DESCRIPTION),
+):
+    return await _execute_ask(body.question, full, orient)
 
 if __name__ == "__main__":
-    uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True)
\ No newline at end of file
+    # Auto-reload is incompatible with multiple workers; for development use
+    # `uvicorn main:app --reload` instead
+    uvicorn.run(
+        "main:app", host="0.0.0.0", port=8000,
+        loop="uvloop", http="httptools", workers=WORKERS, reload=False,
+    )
\ No newline at end of file